@@ -1,19 +1,25 @@
 #hw5a.py
 # BYOMD (Build Your Own Moody Diagram)
 # region imports
+from functools import lru_cache
+import math
 import numpy as np
-from scipy.optimize import fsolve
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from matplotlib.ticker import FormatStrFormatter
 
 # endregion
 
+_MOODY_FIG = None  # Figure holding the drawn Moody diagram, built once by get_or_build_moody
+_MOODY_MARKER = None  # Animated Line2D for the plotted points, drawn by blitting rather than with the curves
+_MOODY_BG = None  # Saved pixels of the axes without the points, restored before each blit
+
 # region functions
 
 def swamee_jain(Re, rr):
     """
     Calculate the approximate friction factor using the Swamee-Jain equation.
-    This is used as an initial guess for the Colebrook equation solver and as a fallback.
+    This is a quick explicit approximation to the Colebrook equation.
 
     :param Re: Reynolds number, dimensionless
     :param rr: Relative roughness (ε/D), dimensionless
@@ -23,103 +29,206 @@ def swamee_jain(Re, rr):
     return 0.25 / (np.log10((rr / 3.7) + (5.74 / Re ** 0.9))) ** 2
 
 
+def clamond(Re, rr):
+    """
+    Calculate the Darcy friction factor from the Colebrook equation using Clamond's direct solution.
+    Two Halley-like updates of the Lambert-W form of Colebrook reach machine precision, so no root
+    finder is needed and the calculation works elementwise on arrays (Clamond, arXiv:0810.5564).
+
+    :param Re: Reynolds number (scalar or array), dimensionless
+    :param rr: Relative roughness (ε/D) (scalar or array), dimensionless
+    :return: Darcy friction factor (f), dimensionless, broadcast to the shape of Re and rr
+    """
+    Re = np.asarray(Re, dtype=float)
+    rr = np.asarray(rr, dtype=float)
+    X1 = rr * Re * 0.123968186335417556  # Zero for a smooth pipe (rr = 0): the updates below reduce to the Prandtl-Karman law
+    X2 = np.log(Re) - 0.779397488455682028
+    F = X2 - 0.2  # Initial guess
+
+    # Two iterations of the quartic (Halley-like) correction
+    E = (np.log(X1 + F) + F - X2) / (1 + X1 + F)
+    F = F - (1 + X1 + F + 0.5 * E) * E * (X1 + F) / (1 + X1 + F + E * (1 + E / 3))
+    E = (np.log(X1 + F) + F - X2) / (1 + X1 + F)
+    F = F - (1 + X1 + F + 0.5 * E) * E * (X1 + F) / (1 + X1 + F + E * (1 + E / 3))
+
+    # Convert the Lambert-W variable back to the friction factor
+    F = 1.151292546497022842 / F
+    return F * F
+
+
+def _clamond_scalar(Re, rr):
+    """
+    Scalar version of clamond() using the math module, for single points such as the user input in hw5b.
+
+    :param Re: Reynolds number, dimensionless
+    :param rr: Relative roughness (ε/D), dimensionless
+    :return: Darcy friction factor (f), dimensionless
+    """
+    X1 = rr * Re * 0.123968186335417556
+    X2 = math.log(Re) - 0.779397488455682028
+    F = X2 - 0.2  # Initial guess
+    for _ in range(2):
+        E = (math.log(X1 + F) + F - X2) / (1 + X1 + F)
+        F -= (1 + X1 + F + 0.5 * E) * E * (X1 + F) / (1 + X1 + F + E * (1 + E / 3))
+    F = 1.151292546497022842 / F
+    return F * F
+
+
 def ff(Re, rr, CBEQN=False):
     """
     Calculate the Darcy friction factor for pipe flow based on the Reynolds number and relative roughness.
     The function handles both laminar and turbulent flow regimes.
 
-    :param Re: Reynolds number, dimensionless
-    :param rr: Relative roughness (ε/D), dimensionless
+    :param Re: Reynolds number (scalar or array), dimensionless
+    :param rr: Relative roughness (ε/D) (scalar or array), dimensionless
     :param CBEQN: Boolean flag to indicate whether to use the Colebrook equation (True) or the laminar flow equation (False)
     :return: Darcy friction factor (f), dimensionless
     """
     if CBEQN:
-        # Colebrook equation for turbulent flow
-        def colebrook(f):
-            """
-            Colebrook equation to solve for the friction factor in turbulent flow.
-            The equation is implicit and requires numerical methods to solve.
-
-            :param f: Friction factor, dimensionless
-            :return: Residual of the Colebrook equation
-            """
-            if f <= 0 or Re <= 0:
-                return 1e6  # Return a large value to avoid invalid operations
-            return 1 / np.sqrt(f) + 2.0 * np.log10((rr / 3.7) + (2.51 / (Re * np.sqrt(f))))
-
-        # Initial guess using Swamee-Jain approximation
-        initial_guess = swamee_jain(Re, rr)
-        try:
-            # Use fsolve to numerically solve the Colebrook equation
-            result = fsolve(colebrook, initial_guess, full_output=True)
-            if result[2] == 1:  # Check if fsolve converged
-                return result[0][0]
-            else:
-                # Fallback to Swamee-Jain approximation if fsolve fails to converge
-                return swamee_jain(Re, rr)
-        except:
-            # Fallback to Swamee-Jain approximation if fsolve fails
-            return swamee_jain(Re, rr)
+        # Colebrook equation for turbulent flow, solved directly with Clamond's method
+        if np.ndim(Re) == 0 and np.ndim(rr) == 0:
+            return _clamond_scalar(float(Re), float(rr))  # Single point: skip numpy array overhead
+        return clamond(Re, rr)
     else:
         # Laminar flow equation (f = 64 / Re)
         return 64 / Re
 
 
-def plotMoody(plotPoint=False, pt=(0, 0)):
+@lru_cache(maxsize=1)
+def _compute_moody():
     """
-    Generate and display a Moody diagram, which plots the Darcy friction factor (f) against the Reynolds number (Re)
-    for various relative roughness values (ε/D). The diagram covers laminar, transitional, and turbulent flow regimes.
+    Calculate the friction factor curves of the Moody diagram. The grid is fixed, so the result is
+    computed once and reused on every later call.
 
-    :param plotPoint: Boolean flag to indicate whether to plot a specific point on the diagram
-    :param pt: Tuple (Re, f) representing the specific point to plot
-    :return: None (displays the plot)
+    :return: Tuple (ReValsL, ReValsTrans, ReValsCB, rrVals, ffLam, ffTrans, ffCB) of numpy arrays
     """
-    # Step 1: Create logspace arrays for ranges of Reynolds numbers (Re)
-    ReValsCB = np.logspace(np.log10(4000), np.log10(1e8), 200)  # Turbulent flow range (Re from 4000 to 10^8)
-    ReValsL = np.logspace(np.log10(600.0), np.log10(2000.0), 20)  # Laminar flow range (Re from 600 to 2000)
-    ReValsTrans = np.logspace(np.log10(2000.0), np.log10(4000.0), 20)  # Transitional flow range (Re from 2000 to 4000)
+    # Step 1: Create geometrically spaced arrays for ranges of Reynolds numbers (Re)
+    ReValsCB = np.geomspace(4000.0, 1e8, 200)  # Turbulent flow range (Re from 4000 to 10^8)
+    ReValsL = np.geomspace(600.0, 2000.0, 20)  # Laminar flow range (Re from 600 to 2000)
+    ReValsTrans = np.geomspace(2000.0, 4000.0, 20)  # Transitional flow range (Re from 2000 to 4000)
 
     # Step 2: Create an array for a range of relative roughness values (ε/D)
     rrVals = np.array(
-        [0, 1E-6, 5E-6, 1E-5, 5E-5, 1E-4, 2E-4, 4E-4, 6E-4, 8E-4, 1E-3, 2E-3, 4E-3, 6E-3, 8E-8, 1.5E-2, 2E-2, 3E-2,
+        [0, 1E-6, 5E-6, 1E-5, 5E-5, 1E-4, 2E-4, 4E-4, 6E-4, 8E-4, 1E-3, 2E-3, 4E-3, 6E-3, 8E-3, 1.5E-2, 2E-2, 3E-2,
          4E-2, 5E-2])
 
     # Step 3: Calculate the friction factor in the laminar range using the laminar flow equation
-    ffLam = np.array([ff(Re, 0) for Re in ReValsL])  # Use list comprehension to calculate f for all Re in ReValsL
+    ffLam = ff(ReValsL, 0)  # Elementwise 64/Re over all Re in ReValsL
 
     # Step 4: Calculate the friction factor in the transitional range
-    ffTrans = np.array([ff(Re, 0) for Re in ReValsTrans])  # Use list comprehension to calculate f for all Re in ReValsTrans
+    ffTrans = ff(ReValsTrans, 0)  # Elementwise 64/Re over all Re in ReValsTrans
 
     # Step 5: Calculate the friction factor values for each relative roughness (rr) at each Reynolds number (Re) for the turbulent range
-    ffCB = np.array([[ff(Re, rr, True) for Re in ReValsCB] for rr in rrVals])  # Use list comprehension to calculate f for each rr
+    Re2d = ReValsCB[np.newaxis, :]  # Re along the columns
+    rr2d = rrVals[:, np.newaxis]  # rr along the rows
+    ffCB = clamond(Re2d, rr2d)  # Solve Colebrook at every grid point; broadcasts to shape (rr, Re)
+
+    return ReValsL, ReValsTrans, ReValsCB, rrVals, ffLam, ffTrans, ffCB
+
+
+def _draw_moody(ax):
+    """
+    Draw the laminar, transitional, and turbulent Moody diagram curves with labels and formatting.
+
+    :param ax: The matplotlib Axes to draw into
+    :return: None
+    """
+    ReValsL, ReValsTrans, ReValsCB, rrVals, ffLam, ffTrans, ffCB = _compute_moody()
 
     # Step 6: Create the plot with the calculated values
-    plt.loglog(ReValsL, ffLam, 'b-', label='Laminar')  # Plot the laminar region as a solid blue line
-    plt.loglog(ReValsTrans, ffTrans, 'b--', label='Transition')  # Plot the transition region as a dashed blue line
+    ax.loglog(ReValsL, ffLam, 'b-', label='Laminar')  # Plot the laminar region as a solid blue line
+    ax.loglog(ReValsTrans, ffTrans, 'b--', label='Transition')  # Plot the transition region as a dashed blue line
+    segs = [np.column_stack([ReValsCB, ffCB[nRelR]]) for nRelR in range(len(ffCB))]
+    ax.add_collection(LineCollection(segs, colors='k', label='Turbulent'))  # Plot the turbulent region for all relative roughnesses as one artist
     for nRelR in range(len(ffCB)):
-        plt.loglog(ReValsCB, ffCB[nRelR], color='k', label=f'rr={rrVals[nRelR]}')  # Plot the turbulent region for each relative roughness
-        plt.annotate(xy=(1e8, ffCB[nRelR][-1]), text=f'{rrVals[nRelR]}', fontsize=8)  # Annotate each turbulent curve at the end
+        ax.annotate(xy=(1e8, ffCB[nRelR][-1]), text=f'{rrVals[nRelR]}', fontsize=8)  # Annotate each turbulent curve at the end
 
     # Step 7: Set the plot limits, labels, and formatting
-    plt.xlim(600, 1e8)  # Set x-axis limits for Reynolds number
-    plt.ylim(0.008, 0.10)  # Set y-axis limits for friction factor
-    plt.xlabel(r"Reynolds number $Re$", fontsize=16)  # Label for x-axis
-    plt.ylabel(r"Friction factor $f$", fontsize=16)  # Label for y-axis
-    plt.text(2.5e8, 0.02, r"Relative roughness $\frac{\epsilon}{d}$", rotation=90, fontsize=16)  # Label for relative roughness
+    ax.set_xlim(600, 1e8)  # Set x-axis limits for Reynolds number
+    ax.set_ylim(0.008, 0.10)  # Set y-axis limits for friction factor
+    ax.set_xlabel(r"Reynolds number $Re$", fontsize=16)  # Label for x-axis
+    ax.set_ylabel(r"Friction factor $f$", fontsize=16)  # Label for y-axis
+    ax.text(2.5e8, 0.02, r"Relative roughness $\frac{\epsilon}{d}$", rotation=90, fontsize=16)  # Label for relative roughness
 
     # Step 8: Format the plot axes and grid
-    ax = plt.gca()  # Get the current axes for customization
     ax.tick_params(axis='both', which='both', direction='in', top=True, right=True, labelsize=12)  # Customize tick marks
     ax.tick_params(axis='both', grid_linewidth=1, grid_linestyle='solid', grid_alpha=0.5)  # Customize grid lines
     ax.tick_params(axis='y', which='minor')  # Minor ticks on y-axis
     ax.yaxis.set_minor_formatter(FormatStrFormatter("%.3f"))  # Format the minor ticks on y-axis
-    plt.grid(which='both')  # Enable both major and minor grid lines
+    ax.grid(which='both')  # Enable both major and minor grid lines
+
+
+def _on_moody_draw(event):
+    """
+    Save the freshly drawn diagram as the blitting background and draw the points on top of it.
+    Connected to the figure's draw_event so the background stays valid after resizes and full redraws.
+    Draws made by savefig (including vector formats, whose canvases cannot blit) only get the points drawn,
+    since the animated marker is otherwise left out of the saved file.
+
+    :param event: The matplotlib DrawEvent
+    :return: None
+    """
+    global _MOODY_BG
+    canvas = event.canvas
+    if getattr(canvas, 'supports_blit', False) and not canvas.is_saving():
+        _MOODY_BG = canvas.copy_from_bbox(canvas.figure.axes[0].bbox)
+    _MOODY_MARKER.draw(event.renderer)  # Use the event's renderer so the points also reach vector output
+
+
+def get_or_build_moody():
+    """
+    Return the figure holding the Moody diagram, drawing it only the first time (or again if its window was closed).
+    Later callers just add their own artists to fig.axes[0].
+
+    :return: The matplotlib Figure containing the Moody diagram
+    """
+    global _MOODY_FIG, _MOODY_MARKER, _MOODY_BG
+    if _MOODY_FIG is None or not plt.fignum_exists(_MOODY_FIG.number):
+        _MOODY_FIG = plt.figure()
+        ax = _MOODY_FIG.add_subplot()
+        _draw_moody(ax)
+        _MOODY_MARKER, = ax.plot([], [], 'ro', markersize=12, markeredgecolor='red', markerfacecolor='none',
+                                 animated=True)  # Red circles for the plotted points
+        _MOODY_BG = None
+        _MOODY_FIG.canvas.mpl_connect('draw_event', _on_moody_draw)
+    return _MOODY_FIG
+
+
+def blit_points(Re, f):
+    """
+    Add the given points to the Moody diagram, keeping the points shown by earlier calls. Only the points are
+    redrawn (blitted) over the saved background, so the curves are not re-rasterized for every update.
+
+    :param Re: Reynolds number(s) of the points, dimensionless
+    :param f: Friction factor(s) of the points, dimensionless
+    :return: None (updates the Moody diagram plot)
+    """
+    fig = get_or_build_moody()
+    ax = fig.axes[0]
+    _MOODY_MARKER.set_data(np.append(_MOODY_MARKER.get_xdata(), Re), np.append(_MOODY_MARKER.get_ydata(), f))
+    if _MOODY_BG is None:
+        fig.canvas.draw()  # First full draw; saves the background and draws the points via _on_moody_draw
+    else:
+        fig.canvas.restore_region(_MOODY_BG)
+        ax.draw_artist(_MOODY_MARKER)
+    fig.canvas.blit(ax.bbox)
+    fig.canvas.flush_events()
+
+
+def plotMoody(plotPoint=False, pt=(0, 0)):
+    """
+    Generate and display a Moody diagram, which plots the Darcy friction factor (f) against the Reynolds number (Re)
+    for various relative roughness values (ε/D). The diagram covers laminar, transitional, and turbulent flow regimes.
+
+    :param plotPoint: Boolean flag to indicate whether to plot a specific point on the diagram
+    :param pt: Tuple (Re, f) representing the specific point to plot
+    :return: None (displays the plot)
+    """
+    get_or_build_moody()  # Reuse the already drawn diagram if there is one
 
     # Step 9: Plot a specific point if requested
     if plotPoint:
-        plt.plot(pt[0], pt[1], 'ro', markersize=12, markeredgecolor='red', markerfacecolor='none')  # Plot a red circle for the point
-        plt.draw()  # Redraw the plot with the new point
-        plt.pause(0.1)  # Pause briefly to update the plot without blocking execution
+        blit_points(pt[0], pt[1])  # Add a red circle for the point without redrawing the curves
 
     # Step 10: Display the plot (this is required to actually show the graph)
     plt.show()  # This will display the plot in a window
@@ -2,11 +2,12 @@
 # Beyond BYOMD: Head Loss Calculator and Moody Diagram Plotter
 # region imports
 import hw5a as pta  # Import the Moody diagram plotting module (which contains plotMoody)
-import random as rnd  # Import random for probabilistic friction factor in transition region
 from matplotlib import pyplot as plt  # Import pyplot for additional plotting functionality
 import numpy as np  # Import numpy for numerical calculations
 # endregion
 
+_RNG = np.random.default_rng()  # Random generator for the probabilistic friction factor in the transition region
+
 # region functions
 
 def ffPoint(Re, rr):
@@ -14,47 +15,67 @@ def ffPoint(Re, rr):
     Calculate the friction factor based on the Reynolds number (Re) and relative roughness (rr).
     The function handles laminar, turbulent, and transitional flow regimes.
 
-    :param Re: Reynolds number, dimensionless
-    :param rr: Relative roughness (ε/D), dimensionless
-    :return: Friction factor (f), dimensionless
+    :param Re: Reynolds number (scalar or array), dimensionless
+    :param rr: Relative roughness (ε/D) (scalar or array), dimensionless
+    :return: Friction factor (f), dimensionless; a float for scalar inputs, otherwise an array
     """
-    if Re >= 4000:
-        # Use Colebrook equation for turbulent flow
-        return pta.ff(Re, rr, CBEQN=True)
-    elif Re <= 2000:
-        # Use laminar flow equation for laminar flow
-        return pta.ff(Re, rr)
-    else:
-        # Transitional flow: Use a probabilistic approach
-        CBff = pta.ff(4000, rr, CBEQN=True)  # Friction factor at Re=4000 using Colebrook
-        Lamff = pta.ff(2000, rr)  # Friction factor at Re=2000 using laminar equation
-        mean = Lamff + (CBff - Lamff) * (Re - 2000) / 2000  # Linear interpolation for mean
+    if np.ndim(Re) == 0 and np.ndim(rr) == 0:
+        # Single point: plain scalar branches, so pta.ff uses its scalar Colebrook solver
+        if Re >= 4000:
+            # Use Colebrook equation for turbulent flow
+            return pta.ff(Re, rr, CBEQN=True)
+        elif Re <= 2000:
+            # Use laminar flow equation for laminar flow
+            return pta.ff(Re, rr)
+        else:
+            # Transitional flow: Use a probabilistic approach
+            CBff = pta.ff(4000, rr, CBEQN=True)  # Friction factor at Re=4000 using Colebrook
+            Lamff = pta.ff(2000, rr)  # Friction factor at Re=2000 using laminar equation
+            mean = Lamff + (CBff - Lamff) * (Re - 2000) / 2000  # Linear interpolation for mean
+            sig = 0.2 * mean  # Standard deviation is 20% of the mean
+            return float(_RNG.normal(mean, sig))  # Randomly select from a normal distribution
+
+    Re, rr = np.broadcast_arrays(np.asarray(Re, dtype=float), np.asarray(rr, dtype=float))
+
+    # Use laminar flow equation everywhere, then Colebrook equation only where the flow is turbulent
+    f = np.array(pta.ff(Re, rr))
+    turb = Re >= 4000
+    if np.any(turb):
+        f[turb] = pta.ff(Re[turb], rr[turb], CBEQN=True)
+
+    # Transitional flow: Use a probabilistic approach
+    trans = (Re > 2000) & (Re < 4000)
+    if np.any(trans):
+        CBff = pta.ff(4000, rr[trans], CBEQN=True)  # Friction factor at Re=4000 using Colebrook
+        Lamff = pta.ff(2000, rr[trans])  # Friction factor at Re=2000 using laminar equation
+        mean = Lamff + (CBff - Lamff) * (Re[trans] - 2000) / 2000  # Linear interpolation for mean
         sig = 0.2 * mean  # Standard deviation is 20% of the mean
-        return rnd.normalvariate(mean, sig)  # Randomly select from a normal distribution
+        f[trans] = _RNG.normal(mean, sig)  # Randomly select from a normal distribution, all points in one draw
+
+    return f
 
 def PlotPoint(Re, f, plot_points):
     """
-    Plot a point on the Moody diagram.
+    Plot one or more points on the Moody diagram.
 
-    :param Re: Reynolds number, dimensionless
-    :param f: Friction factor, dimensionless
+    :param Re: Reynolds number (scalar or array), dimensionless
+    :param f: Friction factor (scalar or array), dimensionless
     :param plot_points: List of points to plot
     :return: None (updates the Moody diagram plot)
     """
-    plot_points.append((Re, f))  # Append the new point to the list
-    pta.plotMoody(plotPoint=True, pt=(Re, f))  # Plot the current point on the Moody diagram
-    plt.draw()  # Draw the updated plot
-    plt.pause(0.1)  # Pause to allow the plot to update
+    plot_points.extend(zip(np.atleast_1d(Re), np.atleast_1d(f)))  # Append the new points to the list
+    pta.blit_points(Re, f)  # Add the new points to those already shown on the cached Moody diagram
     return plot_points  # Return the updated list of points
 
 def calculate_head_loss(diameter_inches, roughness_micro_inches, flow_rate_gpm):
     """
     Calculate the head loss per foot (hf/L) in English units based on user inputs.
+    The inputs may be scalars or arrays of equal shape; every step works elementwise.
 
     :param diameter_inches: Pipe diameter in inches
     :param roughness_micro_inches: Pipe roughness in micro-inches (10^-6 inches)
     :param flow_rate_gpm: Flow rate in gallons per minute (gpm)
-    :return: Head loss per foot (hf/L) in feet of fluid per foot of pipe
+    :return: Tuple (hf/L, Re, f): head loss per foot in feet of fluid per foot of pipe, Reynolds number, and friction factor
     """
     # Convert inputs to consistent units
     diameter_feet = diameter_inches / 12  # Convert diameter to feet
@@ -78,9 +99,15 @@ def calculate_head_loss(diameter_inches, roughness_micro_inches, flow_rate_gpm):
 
     return hf_L, Re, f
 
-def main():
+def main(diameter_inches=None, roughness_micro_inches=None, flow_rate_gpm=None):
     """
     Main function to interact with the user, calculate head loss, and plot results on the Moody diagram.
+    All parameter sets are collected first (from the arguments, or by prompting the user if none are given)
+    and then calculated and plotted in one vectorized pass.
+
+    :param diameter_inches: Optional sequence of pipe diameters in inches
+    :param roughness_micro_inches: Optional sequence of pipe roughnesses in micro-inches
+    :param flow_rate_gpm: Optional sequence of flow rates in gallons per minute
     """
     # Create a list to store plot points
     plot_points = []
@@ -89,36 +116,36 @@ def main():
     plt.ion()  # Turn on interactive mode
     pta.plotMoody()  # Draw the initial empty Moody diagram
 
-    while True:
-        # Prompt the user for input data
-        diameter_inches = float(input("Enter the pipe diameter in inches: "))
-        roughness_micro_inches = float(input("Enter the pipe roughness in micro-inches: "))
-        flow_rate_gpm = float(input("Enter the flow rate in gallons per minute: "))
-
-        # Calculate head loss and friction factor
-        hf_L, Re, f = calculate_head_loss(diameter_inches, roughness_micro_inches, flow_rate_gpm)
-
-        # Determine flow type
-        if Re < 2000:
-            flow_type = 'laminar'
-        elif Re > 4000:
-            flow_type = 'turbulent'
-        else:
-            flow_type = 'transition'
-
-        # Display results
-        print(f"Head loss per foot (hf/L): {hf_L:.6f} ft/ft")
-        print(f"Reynolds number (Re): {Re:.2f}")
-        print(f"Friction factor (f): {f:.4f}")
-        print(f"Flow type: {flow_type}")
-
-        # Plot the point on the Moody diagram and retain previous points
-        plot_points = PlotPoint(Re, f, plot_points)
-
-        # Ask the user if they want to continue entering more parameters
-        continue_input = input("Do you want to enter another set of parameters? (yes/no): ").lower()
-        if continue_input != 'yes':
-            break
+    if diameter_inches is None:
+        diameter_inches, roughness_micro_inches, flow_rate_gpm = [], [], []
+        while True:
+            # Prompt the user for input data
+            diameter_inches.append(float(input("Enter the pipe diameter in inches: ")))
+            roughness_micro_inches.append(float(input("Enter the pipe roughness in micro-inches: ")))
+            flow_rate_gpm.append(float(input("Enter the flow rate in gallons per minute: ")))
+
+            # Ask the user if they want to continue entering more parameters
+            continue_input = input("Do you want to enter another set of parameters? (yes/no): ").lower()
+            if continue_input != 'yes':
+                break
+
+    # Calculate head loss and friction factor for all parameter sets at once
+    hf_L, Re, f = calculate_head_loss(np.asarray(diameter_inches, dtype=float),
+                                      np.asarray(roughness_micro_inches, dtype=float),
+                                      np.asarray(flow_rate_gpm, dtype=float))
+
+    # Determine flow type
+    flow_type = np.where(Re < 2000, 'laminar', np.where(Re > 4000, 'turbulent', 'transition'))
+
+    # Display results
+    for i in range(len(Re)):
+        print(f"Head loss per foot (hf/L): {hf_L[i]:.6f} ft/ft")
+        print(f"Reynolds number (Re): {Re[i]:.2f}")
+        print(f"Friction factor (f): {f[i]:.4f}")
+        print(f"Flow type: {flow_type[i]}")
+
+    # Plot the points on the Moody diagram and retain them
+    plot_points = PlotPoint(Re, f, plot_points)
 
     # Final plot display
     plt.ioff()  # Turn off interactive mode
@@ -6,8 +6,10 @@ from scipy.integrate import solve_ivp  # Import solve_ivp from scipy.integrate
 import matplotlib.pyplot as plt
 # endregion
 
+_ode_system_jit = None  # numba-compiled copy of ode_system, created on first use by solve_numbalsoda
+
 # region functions
-def ode_system(t, X, *params):
+def ode_system(t, X, A_over_m, beta_over_Vrho, yK, rhoA, ps, pa):
     '''
     The ode system is defined in terms of state variables.
     I have as unknowns:
@@ -16,47 +18,98 @@ def ode_system(t, X, *params):
     p1: pressure on right of piston
     p2: pressure on left of the piston
     For initial conditions, we see: x=x0=0, xdot=0, p1=p1_0=p_a, p2=p2_0=p_a
-    :param X: The list of state variables.
+    This is the single definition of the equations: solve_ivp calls it directly, and solve_numbalsoda
+    compiles a copy of it with numba.
     :param t: The time for this instance of the function.
-    :param params: the list of physical constants for the system.
-    :return: The list of derivatives of the state variables.
+    :param X: The list of state variables.
+    :param A_over_m: Piston area over mass, A/m.
+    :param beta_over_Vrho: Bulk modulus over volume times density, beta/(V*rho).
+    :param yK: Valve opening times valve constant, y*Kvalve.
+    :param rhoA: Density times piston area, rho*A.
+    :param ps: Supply pressure.
+    :param pa: Ambient pressure.
+    :return: The tuple of derivatives of the state variables.
     '''
-    # Unpack the parameters
-    A, Cd, ps, pa, V, beta, rho, Kvalve, m, y = params
-
     # State variables
-    x = X[0]  # Position of the piston
     xdot = X[1]  # Velocity of the piston
     p1 = X[2]  # Pressure on the right of the piston
     p2 = X[3]  # Pressure on the left of the piston
 
     # Calculate derivatives
-    xddot = (p1 - p2) * A / m  # Acceleration based on pressure difference
-    p1dot = (y * Kvalve * (ps - p1) - rho * A * xdot) * beta / (V * rho)  # Pressure derivative for p1
-    p2dot = -(y * Kvalve * (p2 - pa) - rho * A * xdot) * beta / (V * rho)  # Pressure derivative for p2
+    xddot = (p1 - p2) * A_over_m  # Acceleration based on pressure difference
+    p1dot = (yK * (ps - p1) - rhoA * xdot) * beta_over_Vrho  # Pressure derivative for p1
+    p2dot = -(yK * (p2 - pa) - rhoA * xdot) * beta_over_Vrho  # Pressure derivative for p2
 
-    # Return the list of derivatives of the state variables
-    return [xdot, xddot, p1dot, p2dot]
+    # Return the tuple of derivatives of the state variables
+    return xdot, xddot, p1dot, p2dot
 
-def main():
+def solve_numbalsoda(ic, t, consts):
+    '''
+    Opt-in alternative to solve_ivp that integrates ode_system in native code with numbalsoda.
+    numba and numbalsoda are imported here rather than at module level because importing and compiling
+    them takes seconds, far more than the single ~2 ms solve_ivp run that main() needs.
+    :param ic: The initial conditions [x, xdot, p1, p2].
+    :param t: The times at which to report the solution.
+    :param consts: The constants of ode_system (A/m, beta/(V*rho), y*Kvalve, rho*A, ps, pa).
+    :return: The array of state variables, one row per state variable like solve_ivp's sln.y.
+    '''
+    global _ode_system_jit
+    from numba import njit, cfunc, carray
+    from numbalsoda import lsoda_sig, lsoda
+
+    # Compiled copy for the native callback, kept as a module global (not a closure) so the cache below can be reused
+    _ode_system_jit = njit(cache=True)(ode_system)
+
+    @cfunc(lsoda_sig, cache=True)
+    def ode_cfunc(t, X, dX, p):
+        '''numbalsoda callback: evaluates _ode_system_jit and writes the derivatives into dX.'''
+        dX[0], dX[1], dX[2], dX[3] = _ode_system_jit(t, carray(X, (4,)), p[0], p[1], p[2], p[3], p[4], p[5])
+
+    usol, success = lsoda(ode_cfunc.address, np.array(ic, dtype=np.float64), t,
+                          data=np.array(consts, dtype=np.float64),
+                          rtol=1e-6, atol=1e-9)  # numbalsoda takes a single atol for all states
+    if not success:
+        raise RuntimeError("numbalsoda lsoda failed to integrate the valve ODE system")
+    return usol.T
+
+def main(use_numbalsoda=False):
+    '''
+    Solve the valve ODE system and plot the piston velocity and the pressures.
+    :param use_numbalsoda: Solve with solve_numbalsoda instead of solve_ivp (requires numba and numbalsoda).
+    '''
     # Define the time array, from 0 to 0.02 seconds, with 200 points
     t = np.linspace(0, 0.02, 200)
 
     # Parameters for the system
     myargs = (4.909E-4, 0.6, 1.4E7, 1.0E5, 1.473E-4, 2.0E9, 850.0, 2.0E-5, 30, 0.002)
+    A, Cd, ps, pa, V, beta, rho, Kvalve, m, y = myargs
+
+    # Combinations of the constants that appear in ode_system, computed once instead of at every step
+    A_over_m = A / m
+    beta_over_Vrho = beta / (V * rho)
+    yK = y * Kvalve
+    rhoA = rho * A
+
+    consts = (A_over_m, beta_over_Vrho, yK, rhoA, ps, pa)
 
     # Initial conditions: x = 0, xdot = 0, p1 = pa, p2 = pa
-    pa = myargs[3]  # pa is the ambient pressure
     ic = [0, 0, pa, pa]  # Initial conditions
 
-    # Call solve_ivp to solve the system of ODEs
-    sln = solve_ivp(ode_system, [0, 0.02], ic, args=myargs, t_eval=t)
+    if use_numbalsoda:
+        # Solve the system of ODEs entirely in native code with numbalsoda
+        Y = solve_numbalsoda(ic, t, consts)
+    else:
+        # Call solve_ivp to solve the system of ODEs; the pressure equations are stiff (beta/(V*rho) ~ 1.6e10),
+        # so use LSODA with absolute tolerances scaled to each state (x, xdot, p1, p2)
+        sln = solve_ivp(ode_system, [0, 0.02], ic, args=consts, t_eval=t, method='LSODA',
+                        rtol=1e-6, atol=[1e-9, 1e-6, 1.0, 1.0])
+        Y = sln.y
 
     # Unpack result into meaningful names
-    xvals = sln.y[0]  # Position of the piston
-    xdot = sln.y[1]  # Velocity of the piston
-    p1 = sln.y[2]  # Pressure on the right of the piston
-    p2 = sln.y[3]  # Pressure on the left of the piston
+    xvals = Y[0]  # Position of the piston
+    xdot = Y[1]  # Velocity of the piston
+    p1 = Y[2]  # Pressure on the right of the piston
+    p2 = Y[3]  # Pressure on the left of the piston
 
     # Plot the velocity (xdot) as a function of time
     plt.subplot(2, 1, 1)